@@ -2,6 +2,8 @@
 import re
 import datetime
 
+import numpy as np
+
 from asdf.tags.core import Software, HistoryEntry
 
 from astropy import units as u
@@ -11,6 +13,96 @@ from jwst.datamodels import NIRCAMGrismModel
 from jwst.datamodels import wcs_ref_models
 
 
+# patterns used to parse the aXe configuration files
+_TOKEN = re.compile(r'\s+|(?<!\d)[,](?!\d)')  # key/value separator
+_LETTERS = re.compile(r"(^[a-zA-Z])")  # starts with a letter
+_NUMBERS = re.compile(r"(^(?:[+\-])?(?:\d*)(?:\.)?(?:\d*)?(?:[eE][+\-]?\d*$)?)")
+_BEAM_KEY = re.compile(r'^[a-zA-Z]*_(?:[+\-]){0,1}[a-zA-Z0-9]{0,1}_*')  # has beam name
+_RANGE_KEY = re.compile(r'^[a-zA-Z]*_[0-1]{1,1}$')  # min/max range variable
+
+# conf keys containing these are only used for simulations and are skipped
+_SKIP_KEYS = ("FILTER", "SENSITIVITY")
+
+# keywords shared by every NIRCAM reference file, the nested instrument
+# dictionary is copied before it is filled in
+_BASE_REF_KW = {
+    "instrument": {"name": "NIRCAM"},
+    "pedigree": "ground",
+    "telescope": "JWST",
+    }
+
+
+def _wavelengthrange_array(wavelengthrange):
+    """Return order, filter, wave min, wave max rows as a structured array.
+
+    The filter field is sized to the longest name in the rows. A ValueError
+    is raised if a value does not survive the conversion, such as an order
+    that is not an integer, rather than silently changing it.
+    """
+    rows = [tuple(x) for x in wavelengthrange]
+    width = max([len(str(row[1])) for row in rows if len(row) > 1] + [1])
+    dtype = np.dtype([('order', 'i8'),
+                      ('filter', 'U{0}'.format(width)),
+                      ('wmin', 'f8'),
+                      ('wmax', 'f8')])
+    array = np.array(rows, dtype=dtype)
+    if array.tolist() != rows:
+        raise ValueError("Expected wavelengthrange rows of integer order, "
+                         "filter, wave min and wave max")
+    return array
+
+
+# default order, filter, wave min, wave max of the wavelengthrange files
+_TSGRISM_DEFAULT_RANGES = _wavelengthrange_array([
+    (1, 'F277W', 2.500411072, 3.807062006),
+    (1, 'F322W2', 2.5011293930000003, 4.215842089),
+    (1, 'F356W', 3.001085025, 4.302320901),
+    (1, 'F444W', 3.696969216, 4.899565197),
+    (2, 'F277W', 2.500411072, 3.2642254050000004),
+    (2, 'F322W2', 2.5011293930000003, 4.136119434),
+    (2, 'F356W', 2.529505253, 4.133416971),
+    (2, 'F444W', 2.5011293930000003, 4.899565197),
+])
+
+_WFSS_DEFAULT_RANGES = _wavelengthrange_array([
+    (1, 'F250M', 2.500411072, 4.800260833),
+    (1, 'F277W', 2.500411072, 3.807062006),
+    (1, 'F300M', 2.684896869, 4.025318456),
+    (1, 'F322W2', 2.5011293930000003, 4.215842089),
+    (1, 'F335M', 3.01459734, 4.260432726),
+    (1, 'F356W', 3.001085025, 4.302320901),
+    (1, 'F360M', 3.178096344, 4.00099629),
+    (1, 'F410M', 3.6267051809999997, 4.5644598),
+    (1, 'F430M', 4.04828939, 4.511761774),
+    (1, 'F444W', 3.696969216, 4.899565197),
+    (1, 'F460M', 3.103778615, 4.881999188),
+    (1, 'F480M', 4.5158154679999996, 4.899565197),
+    (2, 'F250M', 2.500411072, 2.667345336),
+    (2, 'F277W', 2.500411072, 3.2642254050000004),
+    (2, 'F300M', 2.6659796289999997, 3.2997071729999994),
+    (2, 'F322W2', 2.5011293930000003, 4.136119434),
+    (2, 'F335M', 2.54572003, 3.6780519760000003),
+    (2, 'F356W', 2.529505253, 4.133416971),
+    (2, 'F360M', 2.557881113, 4.83740855),
+    (2, 'F410M', 2.5186954019999996, 4.759037127),
+    (2, 'F430M', 2.5362614100000003, 4.541488865),
+    (2, 'F444W', 2.5011293930000003, 4.899565197),
+    (2, 'F460M', 2.575447122, 4.883350419),
+    (2, 'F480M', 2.549773725, 4.899565197),
+])
+
+
+# static fields of the Software entry recorded in the history of the files
+_SOFTWARE_KW = {'name': 'nircam_reftools.py',
+                'homepage': 'https://github.com/spacetelescope/jwreftools',
+                'version': '0.7.1'}
+
+
+def _software(author):
+    """Return a new Software entry for the history of a file."""
+    return Software({**_SOFTWARE_KW, 'author': author})
+
+
 def common_reference_file_keywords(reftype=None,
                                    title=None,
                                    description=None,
@@ -28,26 +120,25 @@ def common_reference_file_keywords(reftype=None,
     if reftype is None:
         raise ValueError("Expected reftype value")
 
+    instrument = dict(_BASE_REF_KW["instrument"])
+    if fname is not None:
+        instrument["filter"] = fname
+    if pupil is not None:
+        instrument["pupil"] = pupil
+    if module is not None:
+        instrument["module"] = module
+
     ref_file_common_keywords = {
+        **_BASE_REF_KW,
         "author": author,
         "description": description,
         "exposure": {"type": exp_type},
-        "instrument": {"name": "NIRCAM"},
-        "pedigree": "ground",
+        "instrument": instrument,
         "reftype": reftype,
-        "telescope": "JWST",
         "title": title,
         "useafter": useafter,
+        **kwargs,
         }
-
-    if fname is not None:
-        ref_file_common_keywords["instrument"]["filter"] = fname
-    if pupil is not None:
-        ref_file_common_keywords["instrument"]["pupil"] = pupil
-    if module is not None:
-        ref_file_common_keywords["instrument"]["module"] = module
-
-    ref_file_common_keywords.update(kwargs)
     return ref_file_common_keywords
 
 
@@ -56,7 +147,8 @@ def create_grism_specwcs(conffile="",
                          module=None,
                          author="STScI",
                          history="",
-                         outname=None):
+                         outname=None,
+                         verbose=False):
     """
     Create an asdf reference file to hold Grism C (column) or Grism R (rows)
     configuration information, no sensativity information is included
@@ -104,6 +196,9 @@ def create_grism_specwcs(conffile="",
         A comment about the refrence file to be saved with the meta information
     outname : str
         Output name for the reference file
+    verbose : bool
+        If True, print the derived parameters and the values read
+        from the conffile
 
     Returns
     -------
@@ -115,13 +210,14 @@ def create_grism_specwcs(conffile="",
     if not history:
         history = "Created from {0:s}".format(conffile)
 
-    # if pupil is none get from filename like NIRCAM_modB_R.conf
+    # if pupil or module is none get from filename like NIRCAM_modB_R.conf
+    stem = conffile.rsplit(".", 1)[0]
     if pupil is None:
-        pupil = "GRISM" + conffile.split(".")[0][-1]
-    # if module is none get from filename
+        pupil = "GRISM" + stem[-1]
     if module is None:
-        module = conffile.split(".")[0][-3]
-    print("Pupil is {}".format(pupil))
+        module = stem[-3]
+    if verbose:
+        print("Pupil is {}".format(pupil))
 
     ref_kw = common_reference_file_keywords(reftype="specwcs",
                                             title="NIRCAM Grism Parameters",
@@ -135,25 +231,9 @@ def create_grism_specwcs(conffile="",
                                             )
 
     # get all the key-value pairs from the input file
-    conf = dict_from_file(conffile)
+    conf = dict_from_file(conffile, verbose=verbose)
     beamdict = split_order_info(conf)
 
-    # beam = re.compile('^(?:[+\-]){0,1}[a-zA-Z0-9]{0,1}$')  # match beam only
-    # read in the sensitivity tables to save their content
-    # they currently have names like this: NIRCam.A.1st.sensitivity.fits
-    # translated as inst.beam/order.param
-    temp = dict()
-    etoken = re.compile("^[a-zA-Z]*_(?:[+\-]){1,1}[1,2]{1,1}")  # find beam key
-    for b, bdict in beamdict.items():
-            temp[b] = dict()
-
-    # add the new beam information to beamdict and remove spurious beam info
-    for k in temp:
-        for kk in temp[k]:
-            if etoken.match(kk):
-                kk = kk.replace("_{}".format(k), "")
-            beamdict[k][kk] = temp[k][kk]
-
     # for NIRCAM, the R and C grism coefficients contain zeros where
     # the dispersion is in the opposite direction. Meaning, the GRISMR,
     # which disperses along ROWS has coefficients of zero in the y models
@@ -169,58 +249,31 @@ def create_grism_specwcs(conffile="",
     # appropriate dispersion direction in use. This eliminates having to decide
     # which direction to calculatethe dispersion from given the input x,y
     # pixel in the dispersed image.
-    orders = beamdict.keys()
+    orders = list(beamdict.keys())
+
+    # gather the coefficients of every order, converting the displ
+    # wavelengths to microns if the input file is still in angstroms
+    l0, l1 = _order_coefficients(beamdict, orders, 'DISPL') / 10000.
+    x0, x1 = _order_coefficients(beamdict, orders, 'DISPX')
+    y0, y1 = _order_coefficients(beamdict, orders, 'DISPY')
+
+    il0, il1 = _invert_linear(l0, l1)
+    ix0, ix1 = _invert_linear(x0, x1)
+    iy0, iy1 = _invert_linear(y0, y1)
 
     # dispersion models valid per order and direction saved to reference file
+    # The wavelength lookup models are INVDISPL for backward, returning t,
+    # and DISPL for forward, returning wavelength.
+    # For the R grism the x models are INVDISPX returning t, for the C grism
+    # they are DISPX; the y models are the other way around.
     # Forward
-    invdispl = []
-    invdispx = []
-    invdispy = []
+    invdispl = _linear_models(il0, il1)
+    invdispx = _linear_models(ix0, ix1)
+    invdispy = _linear_models(iy0, iy1)
     # Backward
-    displ = []
-    dispx = []
-    dispy = []
-
-    for order in orders:
-        # convert the displ wavelengths to microns if the input
-        # file is still in angstroms
-        l0 = beamdict[order]['DISPL'][0] / 10000.
-        l1 = beamdict[order]['DISPL'][1] / 10000.
-
-        # create polynomials using the coefficients of each order
-
-        # This holds the wavelength lookup coeffs
-        # This model is  INVDISPL for backward and returns t
-        # This model should be DISPL for forward and returns wavelength
-        if l1 == 0:
-            lmodel = Polynomial1D(1, c0=0, c1=0)
-        else:
-            lmodel = Polynomial1D(1, c0=-l0/l1, c1=1./l1)
-        invdispl.append(lmodel)
-        lmodel = Polynomial1D(1, c0=l0, c1=l1)
-        displ.append(lmodel)
-
-        # This holds the x coefficients, for the R grism this model is the
-        # the INVDISPX returning t, for the C grism this model is the DISPX
-        x0, x1 = beamdict[order]['DISPX']
-        xmodel = Polynomial1D(1, c0=x0, c1=x1)
-        dispx.append(xmodel)
-        if x1 == 0:
-            xmodel = Polynomial1D(1, c0=0, c1=0)
-        else:
-            xmodel = Polynomial1D(1, c0=-x0/x1, c1=1./x1)
-        invdispx.append(xmodel)
-
-        # This holds the y coefficients, for the C grism, this model is
-        # the INVDISPY, returning t, for the R grism, this model is the DISPY
-        y0, y1 = beamdict[order]['DISPY']
-        ymodel = Polynomial1D(1, c0=y0, c1=y1)
-        dispy.append(ymodel)
-        if y1 == 0:
-            ymodel = Polynomial1D(1, c0=0, c1=0)
-        else:
-            ymodel = Polynomial1D(1, c0=-y0/y1, c1=1./y1)
-        invdispy.append(ymodel)
+    displ = _linear_models(l0, l1)
+    dispx = _linear_models(x0, x1)
+    dispy = _linear_models(y0, y1)
 
     # change the orders into translatable integers
     # so that we can look up the order with the proper index
@@ -240,17 +293,107 @@ def create_grism_specwcs(conffile="",
     ref.invdispl = invdispl
     ref.order = oo
     history = HistoryEntry({'description': history,
-                            'time': datetime.datetime.utcnow()})
-    software = Software({'name': 'nircam_reftools.py',
-                         'author': author,
-                         'homepage': 'https://github.com/spacetelescope/jwreftools',
-                         'version': '0.7.1'})
-    history['software'] = software
+                            'time': datetime.datetime.now(datetime.timezone.utc)})
+    history['software'] = _software(author)
     ref.history = [history]
     ref.to_asdf(outname)
     ref.validate()
 
 
+def _order_coefficients(beamdict, orders, key):
+    """Return the c0 and c1 arrays of the ``key`` polynomial of each order.
+
+    Raises ValueError if an order does not have exactly two coefficients
+    for ``key``, rather than pairing up values from different orders.
+    """
+    coeffs = np.empty((len(orders), 2))
+    for i, order in enumerate(orders):
+        value = beamdict[order][key]
+        if np.shape(value) != (2,):
+            raise ValueError("Expected two {0} coefficients for order {1}, "
+                             "got {2!r}".format(key, order, value))
+        coeffs[i] = value
+    return coeffs.T
+
+
+def _linear_models(c0, c1):
+    """Return a degree 1 Polynomial1D model for each pair of coefficients."""
+    # bind the class locally, it is looked up once per model otherwise
+    poly = Polynomial1D
+    return [poly(1, c0=a, c1=b) for a, b in zip(c0, c1)]
+
+
+def _invert_linear(c0, c1):
+    """Return the coefficients of the inverses of c0 + c1 * t.
+
+    The inverse of each polynomial is (x - c0) / c1, the coefficients are
+    set to zero where c1 is zero, which is the axis the grism does not
+    disperse along.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nonzero = c1 != 0
+        return (np.where(nonzero, -c0 / c1, 0.),
+                np.where(nonzero, 1. / c1, 0.))
+
+
+def dispersion_coefficients(models):
+    """Return the coefficients of a list of polynomial models as an array.
+
+    The specwcs reference files store astropy ``Polynomial1D`` models, which
+    is what the NIRCAMGrismModel schema serializes. Evaluating them on large
+    pixel grids goes through the full modeling machinery on every call, so
+    this exposes their coefficients for direct evaluation with numpy.
+
+    Parameters
+    ----------
+    models : list
+        Polynomial1D models of the same degree, one per order, such as
+        ``ref.displ`` or ``ref.invdispx``
+
+    Returns
+    -------
+    coeffs : numpy.ndarray
+        Array of shape (norders, degree + 1) with the coefficients of each
+        model in increasing power, as expected by
+        ``numpy.polynomial.polynomial.polyval``
+
+    Examples
+    --------
+    >>> coeffs = dispersion_coefficients(ref.displ)  # doctest: +SKIP
+    >>> wavelength = np.polynomial.polynomial.polyval(t, coeffs[order])  # doctest: +SKIP
+
+    """
+    return np.array([m.parameters for m in models], dtype=float)
+
+
+def evaluate_dispersion(coeffs, order_index, t):
+    """Evaluate per-order dispersion polynomials over many pixels at once.
+
+    Parameters
+    ----------
+    coeffs : numpy.ndarray
+        Coefficients as returned by `dispersion_coefficients`
+    order_index : int or numpy.ndarray
+        Index into ``coeffs`` of the order to use, either a single order
+        or one per value of ``t``
+    t : float or numpy.ndarray
+        The values to evaluate the polynomials at
+
+    Returns
+    -------
+    result : numpy.ndarray
+        The polynomials evaluated with Horner's rule, broadcast over
+        ``order_index`` and ``t``
+
+    """
+    c = np.asarray(coeffs, dtype=float)[np.asarray(order_index)]
+    t = np.asarray(t, dtype=float)
+    result = np.zeros(np.broadcast(c[..., 0], t).shape)
+    for i in range(c.shape[-1] - 1, -1, -1):
+        result = result * t + c[..., i]
+    return result
+
+
 def create_tsgrism_wavelengthrange(outname="nircam_tsgrism_wavelengthrange.asdf",
                                    history="Ground NIRCAM TSGrism wavelengthrange",
                                    author="STScI",
@@ -266,39 +409,15 @@ def create_tsgrism_wavelengthrange(outname="nircam_tsgrism_wavelengthrange.asdf"
         History information about it's creation
     author: str
         Person or entity making the file
-    wavelengthrange: list(tuples)
-        A list of tuples that set the order, filter, and
-        wavelength range min and max
+    wavelengthrange: list(tuples) or numpy.ndarray
+        A list of tuples, or structured array, that set the order,
+        filter, and wavelength range min and max
     extract_orders: list[list]
         A list of lists that specify
 
     """
-    ref_kw = common_reference_file_keywords(reftype="wavelengthrange",
-                                            title="NIRCAM TSGRISM reference file",
-                                            description="NIRCAM Grism-Filter Wavelength Ranges",
-                                            exp_type="NRC_TSGRISM",
-                                            author=author,
-                                            pupil="ANY",
-                                            model_type="WavelengthrangeModel",
-                                            filename=outname,
-                                            )
-
     if wavelengthrange is None:
-        # This is a list of tuples that specify the
-        # order, filter, wave min, wave max
-        wavelengthrange = [(1, 'F277W', 2.500411072, 3.807062006),
-                           (1, 'F322W2', 2.5011293930000003, 4.215842089),
-                           (1, 'F356W', 3.001085025, 4.302320901),
-                           (1, 'F444W', 3.696969216, 4.899565197),
-                           (2, 'F277W', 2.500411072, 3.2642254050000004),
-                           (2, 'F322W2', 2.5011293930000003, 4.136119434),
-                           (2, 'F356W', 2.529505253, 4.133416971),
-                           (2, 'F444W', 2.5011293930000003, 4.899565197),
-                           ]
-
-    # array of integers of unique orders
-    orders = sorted(set((x[0] for x in wavelengthrange)))
-    filters = sorted(set((x[1] for x in wavelengthrange)))
+        wavelengthrange = _TSGRISM_DEFAULT_RANGES
 
     # Nircam has not specified any limitation on the orders
     # that should be extracted by default yet so all are
@@ -310,26 +429,13 @@ def create_tsgrism_wavelengthrange(outname="nircam_tsgrism_wavelengthrange.asdf"
                           ('F444W', [1]),
                           ]
 
-    ref = wcs_ref_models.WavelengthrangeModel()
-    ref.meta.update(ref_kw)
-    ref.meta.exposure.p_exptype = "NRC_TSGRISM"
-    ref.meta.input_units = u.micron
-    ref.meta.output_units = u.micron
-    ref.wavelengthrange = wavelengthrange
-    ref.extract_orders = extract_orders
-    ref.order = orders
-    ref.waverange_selector = filters
-
-    history = HistoryEntry({'description': history,
-                            'time': datetime.datetime.utcnow()})
-    software = Software({'name': 'nircam_reftools.py',
-                         'author': author,
-                         'homepage': 'https://github.com/spacetelescope/jwreftools',
-                         'version': '0.7.1'})
-    history['software'] = software
-    ref.history = [history]
-    ref.validate()
-    ref.to_asdf(outname)
+    _create_wavelengthrange(outname=outname,
+                            exp_type="NRC_TSGRISM",
+                            title="NIRCAM TSGRISM reference file",
+                            history=history,
+                            author=author,
+                            wavelengthrange=wavelengthrange,
+                            extract_orders=extract_orders)
 
 
 def create_wfss_wavelengthrange(outname="nircam_wfss_wavelengthrange.asdf",
@@ -347,58 +453,47 @@ def create_wfss_wavelengthrange(outname="nircam_wfss_wavelengthrange.asdf",
         History information about it's creation
     author: str
         Person or entity making the file
-    wavelengthrange: list(tuples)
-        A list of tuples that set the order, filter, and
-        wavelength range min and max
+    wavelengthrange: list(tuples) or numpy.ndarray
+        A list of tuples, or structured array, that set the order,
+        filter, and wavelength range min and max
     extract_orders: list[list]
         A list of lists that specify
 
+    """
+    if wavelengthrange is None:
+        wavelengthrange = _WFSS_DEFAULT_RANGES
+
+    _create_wavelengthrange(outname=outname,
+                            exp_type="NRC_WFSS",
+                            title="NIRCAM WFSS reference file",
+                            history=history,
+                            author=author,
+                            wavelengthrange=wavelengthrange,
+                            extract_orders=extract_orders)
+
+
+def _create_wavelengthrange(outname, exp_type, title, history, author,
+                            wavelengthrange, extract_orders=None):
+    """Write a NIRCAM wavelengthrange reference file for one exposure type.
+
+    When extract_orders is None every order is extracted for every filter.
     """
     ref_kw = common_reference_file_keywords(reftype="wavelengthrange",
-                                            title="NIRCAM WFSS reference file",
+                                            title=title,
                                             description="NIRCAM Grism-Filter Wavelength Ranges",
-                                            exp_type="NRC_WFSS",
+                                            exp_type=exp_type,
                                             author=author,
                                             pupil="ANY",
                                             model_type="WavelengthrangeModel",
                                             filename=outname,
                                             )
 
-    if wavelengthrange is None:
-        # This is a list of tuples that specify the
-        # order, filter, wave min, wave max
-        wavelengthrange = [(1, 'F250M', 2.500411072, 4.800260833),
-                           (1, 'F277W', 2.500411072, 3.807062006),
-                           (1, 'F300M', 2.684896869, 4.025318456),
-                           (1, 'F322W2', 2.5011293930000003, 4.215842089),
-                           (1, 'F335M', 3.01459734, 4.260432726),
-                           (1, 'F356W', 3.001085025, 4.302320901),
-                           (1, 'F360M', 3.178096344, 4.00099629),
-                           (1, 'F410M', 3.6267051809999997, 4.5644598),
-                           (1, 'F430M', 4.04828939, 4.511761774),
-                           (1, 'F444W', 3.696969216, 4.899565197),
-                           (1, 'F460M', 3.103778615, 4.881999188),
-                           (1, 'F480M', 4.5158154679999996, 4.899565197),
-                           (2, 'F250M', 2.500411072, 2.667345336),
-                           (2, 'F277W', 2.500411072, 3.2642254050000004),
-                           (2, 'F300M', 2.6659796289999997, 3.2997071729999994),
-                           (2, 'F322W2', 2.5011293930000003, 4.136119434),
-                           (2, 'F335M', 2.54572003, 3.6780519760000003),
-                           (2, 'F356W', 2.529505253, 4.133416971),
-                           (2, 'F360M', 2.557881113, 4.83740855),
-                           (2, 'F410M', 2.5186954019999996, 4.759037127),
-                           (2, 'F430M', 2.5362614100000003, 4.541488865),
-                           (2, 'F444W', 2.5011293930000003, 4.899565197),
-                           (2, 'F460M', 2.575447122, 4.883350419),
-                           (2, 'F480M', 2.549773725, 4.899565197),
-                           ]
+    wavelengthrange = _wavelengthrange_array(wavelengthrange)
+
     # array of integers of unique orders
-    orders = sorted(set((x[0] for x in wavelengthrange)))
-    filters = sorted(set((x[1] for x in wavelengthrange)))
+    orders = np.unique(wavelengthrange['order']).tolist()
+    filters = np.unique(wavelengthrange['filter']).tolist()
 
-    # Nircam has not specified any limitation on the orders
-    # that should be extracted by default yet so all are
-    # included.
     if extract_orders is None:
         extract_orders = []
         for f in filters:
@@ -406,21 +501,18 @@ def create_wfss_wavelengthrange(outname="nircam_wfss_wavelengthrange.asdf",
 
     ref = wcs_ref_models.WavelengthrangeModel()
     ref.meta.update(ref_kw)
-    ref.meta.exposure.p_exptype = "NRC_WFSS"
+    ref.meta.exposure.p_exptype = exp_type
     ref.meta.input_units = u.micron
     ref.meta.output_units = u.micron
-    ref.wavelengthrange = wavelengthrange
+    # the schema stores the ranges as a list of rows
+    ref.wavelengthrange = wavelengthrange.tolist()
     ref.extract_orders = extract_orders
     ref.order = orders
     ref.waverange_selector = filters
 
     history = HistoryEntry({'description': history,
-                            'time': datetime.datetime.utcnow()})
-    software = Software({'name': 'nircam_reftools.py',
-                         'author': author,
-                         'homepage': 'https://github.com/spacetelescope/jwreftools',
-                         'version': '0.7.1'})
-    history['software'] = software
+                            'time': datetime.datetime.now(datetime.timezone.utc)})
+    history['software'] = _software(author)
     ref.history = [history]
     ref.validate()
     ref.to_asdf(outname)
@@ -450,49 +542,28 @@ def split_order_info(keydict):
     if not isinstance(keydict, dict):
         raise ValueError("Expected an input dictionary")
 
-    # has beam name fits token
-    token = re.compile('^[a-zA-Z]*_(?:[+\-]){0,1}[a-zA-Z0-9]{0,1}_*')
-    rangekey = re.compile('^[a-zA-Z]*_[0-1]{1,1}$')
     rdict = dict()  # return dictionary
-    beams = list()
-
-    # prefetch number of Beams, beam is the second string
-    for key in keydict:
-        if token.match(key):
-            b = key.split("_")[1].upper()
-            if b not in beams:
-               beams.append(b)
-    for b in beams:
-        rdict[b] = dict()
 
     #  assumes that keys are sep with underscore and beam is in second section
-    for key in keydict:
-        if token.match(key):
-            b = key.split("_")[1].upper()
-            newkey = key.replace("_{}".format(b), "")
-            rdict[b][newkey] = keydict[key]
+    for key, value in keydict.items():
+        if _BEAM_KEY.match(key):
+            b = key.split("_", 2)[1].upper()
+            newkey = key.replace("_{}".format(b), "", 1)
+            rdict.setdefault(b, dict())[newkey] = value
 
     # look for range variables to make them into tuples
     for b, d in rdict.items():
-        keys = d.keys()
-        rkeys = []
-        odict = {}
-        for k in keys:
-            if rangekey.match(k):
-                rkeys.append(k)
+        rkeys = [k for k in d if _RANGE_KEY.match(k)]
+        # group the range values by their root name and index
+        groups = {}
         for k in rkeys:
-            mlist = [m for m in rkeys if k.split("_")[0] in m]
-            root = mlist[0].split("_")[0]
-            if root not in odict:
-                for mk in mlist:
-                    if eval(mk[-1]) == 0:
-                        zero = d[mk]
-                    elif eval(mk[-1]) == 1:
-                        one = d[mk]
-                    else:
-                        raise ValueError("Unexpected range variable {}"
-                                         .format(mk))
-                odict[root] = (zero, one)
+            root, idx = k.rsplit("_", 1)
+            groups.setdefault(root, {})[int(idx)] = d[k]
+        odict = {}
+        for root, g in groups.items():
+            if 0 not in g or 1 not in g:
+                raise ValueError("Incomplete range variable {}".format(root))
+            odict[root] = (g[0], g[1])
         # combine the dictionaries and remove the old keys
         d.update(odict)
         for k in rkeys:
@@ -501,7 +572,14 @@ def split_order_info(keydict):
     return rdict
 
 
-def dict_from_file(filename):
+def _parse_number(val):
+    """Convert a numeric string from a conf file to an int or float."""
+    if val.lstrip("+-").isdigit():
+        return int(val)
+    return float(val)
+
+
+def dict_from_file(filename, verbose=False):
     """Read in a file and return a named tuple of the key value pairs.
 
     This is a generic read for a text file with the line following format:
@@ -516,6 +594,8 @@ def dict_from_file(filename):
     ----------
     filename : str
         Name of the file to interpret
+    verbose : bool
+        If True, print each key and value as it is read
 
     Examples
     --------
@@ -526,41 +606,39 @@ def dict_from_file(filename):
     dictionary of deciphered keys and values
 
     """
-    token = '\s+|(?<!\d)[,](?!\d)'
-    letters = re.compile("(^[a-zA-Z])")  # starts with a letter
-    numbers = re.compile("(^(?:[+\-])?(?:\d*)(?:\.)?(?:\d*)?(?:[eE][+\-]?\d*$)?)")
-    empty = re.compile("(^\s*$)")  # is a blank line
-
-    print("\nReading {0:s}  ...".format(filename))
-    with open(filename, 'r') as fh:
-        lines = fh.readlines()
+    if verbose:
+        print("\nReading {0:s}  ...".format(filename))
     content = dict()
-    for line in lines:
-        value = None
-        key = None
-        if not empty.match(line):
-            if letters.match(line):
-                pair = re.split(token, line.strip(), maxsplit=3)
-                if len(pair) == 2:  # key and value exist
-                    key = pair[0]  # first item is the key
-                    val = pair[1]  # second item is the value
-                    if letters.match(val):
-                        value = val
-                    if numbers.fullmatch(val):
-                        value = eval(val)
-                if len(pair) == 3:  # key min max exist
-                    key = pair[0]
-                    val1, val2 = pair[1:]
-                    if numbers.fullmatch(val1) and numbers.fullmatch(val2):
-                        value = (eval(val1), eval(val2))
-                    else:
-                        raise ValueError("Min/max values expected for {0}"
-                                         .format(key))
-        # ignore the filter file pointings and the sensitivity files these are
-        # used for simulation
-        if key and (value is not None):
-            if (("FILTER" not in key) and ("SENSITIVITY" not in key)):
-                content[key] = value
-                print("Setting {0:s} = {1}".format(key, value))
+    with open(filename, 'r') as fh:
+        for line in fh:
+            # skip blank lines and lines not starting with a keyword
+            stripped = line.strip()
+            if not stripped or not _LETTERS.match(line):
+                continue
+            value = None
+            key = None
+            pair = _TOKEN.split(stripped, maxsplit=3)
+            if len(pair) == 2:  # key and value exist
+                key = pair[0]  # first item is the key
+                val = pair[1]  # second item is the value
+                if _LETTERS.match(val):
+                    value = val
+                if _NUMBERS.fullmatch(val):
+                    value = _parse_number(val)
+            if len(pair) == 3:  # key min max exist
+                key = pair[0]
+                val1, val2 = pair[1:]
+                if _NUMBERS.fullmatch(val1) and _NUMBERS.fullmatch(val2):
+                    value = (_parse_number(val1), _parse_number(val2))
+                else:
+                    raise ValueError("Min/max values expected for {0}"
+                                     .format(key))
+            # ignore the filter file pointings and the sensitivity files
+            # these are used for simulation
+            if key and (value is not None):
+                if not any(skip in key for skip in _SKIP_KEYS):
+                    content[key] = value
+                    if verbose:
+                        print("Setting {0:s} = {1}".format(key, value))
 
     return content
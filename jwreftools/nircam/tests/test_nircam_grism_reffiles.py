@@ -0,0 +1,134 @@
+"""
+Test for nircam_grism_reffiles
+"""
+import numpy as np
+import pytest
+
+from astropy.modeling.models import Polynomial1D
+
+from .. import nircam_grism_reffiles
+
+
+def test_dispersion_coefficients():
+    models = [Polynomial1D(1, c0=1., c1=2.),
+              Polynomial1D(1, c0=-3., c1=0.5)]
+
+    coeffs = nircam_grism_reffiles.dispersion_coefficients(models)
+
+    assert coeffs.shape == (2, 2)
+    assert np.allclose(coeffs, [[1., 2.], [-3., 0.5]])
+
+
+def test_evaluate_dispersion():
+    models = [Polynomial1D(1, c0=1., c1=2.),
+              Polynomial1D(1, c0=-3., c1=0.5),
+              Polynomial1D(1, c0=0., c1=0.)]
+    coeffs = nircam_grism_reffiles.dispersion_coefficients(models)
+    t = np.linspace(-2., 5., 12).reshape(3, 4)
+
+    # a single order for every pixel
+    for i, model in enumerate(models):
+        result = nircam_grism_reffiles.evaluate_dispersion(coeffs, i, t)
+        assert result.shape == t.shape
+        assert np.allclose(result, model(t))
+
+    # a different order for each pixel
+    order_index = np.array([[0, 1, 2, 0],
+                            [1, 1, 0, 2],
+                            [2, 0, 1, 1]])
+    result = nircam_grism_reffiles.evaluate_dispersion(coeffs, order_index, t)
+    expected = np.array([models[i](x) for i, x in zip(order_index.ravel(),
+                                                      t.ravel())])
+    assert result.shape == t.shape
+    assert np.allclose(result, expected.reshape(t.shape))
+
+    # scalar order and value
+    result = nircam_grism_reffiles.evaluate_dispersion(coeffs, 1, 4.)
+    assert np.allclose(result, models[1](4.))
+
+
+def test_dict_from_file(tmp_path):
+    conffile = tmp_path / "NIRCAM_modA_R.conf"
+    conffile.write_text("# comment line\n"
+                        "INSTRUMENT NIRCAM\n"
+                        "\n"
+                        "BEAM_+1 -10 300\n"
+                        "DISPX_+1_0 -3\n"
+                        "DISPX_+1_1 +2.5\n"
+                        "DISPL_+1_0 .5\n"
+                        "DISPL_+1_1 1.2e3\n"
+                        "XOFF_+1 007\n"
+                        "FILTER_+1 NIRCam.A.1st.filter.fits\n"
+                        "SENSITIVITY_+1 NIRCam.A.1st.sensitivity.fits\n")
+
+    content = nircam_grism_reffiles.dict_from_file(str(conffile))
+
+    assert content == {"INSTRUMENT": "NIRCAM",
+                       "BEAM_+1": (-10, 300),
+                       "DISPX_+1_0": -3,
+                       "DISPX_+1_1": 2.5,
+                       "DISPL_+1_0": 0.5,
+                       "DISPL_+1_1": 1200.,
+                       "XOFF_+1": 7,
+                       }
+    assert isinstance(content["DISPX_+1_0"], int)
+    assert isinstance(content["DISPL_+1_1"], float)
+
+
+def test_dict_from_file_bad_number(tmp_path):
+    conffile = tmp_path / "NIRCAM_modA_R.conf"
+    conffile.write_text("DISPX_+1_0 1e\n")
+
+    with pytest.raises(ValueError):
+        nircam_grism_reffiles.dict_from_file(str(conffile))
+
+
+def test_split_order_info_ranges():
+    keydict = {"DISPX_+1_0": 0.5,
+               "DISPX_+1_1": 2.,
+               "DISPL_+1_1": 1.5,
+               "DISPL_+1_0": 3.,
+               "XOFF_+1": 0.}
+
+    beams = nircam_grism_reffiles.split_order_info(keydict)
+
+    assert beams == {"+1": {"DISPX": (0.5, 2.),
+                            "DISPL": (3., 1.5),
+                            "XOFF": 0.}}
+
+
+def test_split_order_info_incomplete_range():
+    keydict = {"DISPX_+1_0": 0.5,
+               "DISPX_+1_1": 2.,
+               "DISPL_+1_0": 3.}
+
+    with pytest.raises(ValueError, match="DISPL"):
+        nircam_grism_reffiles.split_order_info(keydict)
+
+
+def test_split_order_info_beams():
+    keydict = {"INSTRUMENT": "NIRCAM",
+               "DISPX_+1_0": 0.5,
+               "DISPX_+1_1": 2.,
+               "DISPX_-1_0": -0.5,
+               "DISPX_-1_1": -2.,
+               "XOFF_+1_+1": 1.}
+
+    beams = nircam_grism_reffiles.split_order_info(keydict)
+
+    assert list(beams) == ["+1", "-1"]
+    assert beams["+1"] == {"DISPX": (0.5, 2.), "XOFF_+1": 1.}
+    assert beams["-1"] == {"DISPX": (-0.5, -2.)}
+
+
+def test_wavelengthrange_array():
+    rows = [(1, 'F277W', 2.5, 3.8),
+            (70000, 'A_VERY_LONG_FILTER_NAME', 2.5, 4.9)]
+
+    wavelengthrange = nircam_grism_reffiles._wavelengthrange_array(rows)
+
+    assert wavelengthrange.tolist() == rows
+    assert np.unique(wavelengthrange['order']).tolist() == [1, 70000]
+
+    with pytest.raises(ValueError):
+        nircam_grism_reffiles._wavelengthrange_array([(1.5, 'F277W', 2.5, 3.8)])